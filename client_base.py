@@ -1,12 +1,21 @@
+import json
 import time
+import base64
+import random
+import asyncio
+import functools
 import logging
 import requests
 import threading
-import posixpath
 from urllib.parse import urlsplit, urlunsplit
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 from datamodel import MISSING
-from ezsgconnect import sgconnect
 
 from .config import config, XOneEnv, ApiConfig
 
@@ -17,7 +26,7 @@ __all__ = [
 
 
 def is_ok(status):
-    return 299 >= status >= 200
+    return status // 100 == 2
 
 
 class HttpClientError(requests.HTTPError):
@@ -58,18 +67,44 @@ def check_response(resp: requests.Response) -> requests.Response:
     return resp
 
 
-def raise_error(status, content):
-    if is_ok(status):
-        return
+def check_httpx_response(resp):
+    if not is_ok(resp.status_code):
+        message = f'{resp.status_code}: {resp.text}'
+        if resp.status_code == 403:
+            raise Unauthorized(message)
+        elif resp.status_code == 404:
+            raise NotFound(message)
+        else:
+            raise ClientError(message)
+
+    return resp
+
+
+async def check_aiohttp_response(resp: 'aiohttp.ClientResponse') -> 'aiohttp.ClientResponse':
+    if not is_ok(resp.status):
+        message = f'{resp.status}: {await resp.text()}'
+        if resp.status == 403:
+            raise Unauthorized(message)
+        elif resp.status == 404:
+            raise NotFound(message)
+        else:
+            raise ClientError(message)
+
+    return resp
 
-    if 499 >= status >= 400:
-        raise HttpClientError(status, content)
 
-    elif 599 >= status >= 500:
-        raise HttpServerError(status, content)
+_ERROR_BY_BUCKET = {
+    4: HttpClientError,
+    5: HttpServerError,
+}
 
-    else:
-        raise requests.HTTPError(status, content)
+
+def raise_error(status, content):
+    bucket = status // 100
+    if bucket == 2:
+        return
+
+    raise _ERROR_BY_BUCKET.get(bucket, requests.HTTPError)(status, content)
 
 
 def get_logger():
@@ -78,13 +113,109 @@ def get_logger():
 
 def url_join(url: str, *args) -> str:
     scheme, netloc, path, query, fragment = urlsplit(url)
-    path = path if len(path) else "/"
-    path = posixpath.join(path, *[('{}'.format(x)) for x in args])
+    if args:
+        # All XOne path segments are relative, so a plain join beats
+        # posixpath.join's absolute-segment handling.
+        path = path.rstrip('/') + '/' + '/'.join(str(x) for x in args)
+    elif not path:
+        path = '/'
     return urlunsplit([scheme, netloc, path, query, fragment])
 
 
+# Endpoints repeat across requests, so the urlsplit/posixpath/urlunsplit
+# work in url_join is invariant for a given argument tuple; memoize it.
+@functools.lru_cache(maxsize=1024)
+def _cached_url_join(url: str, *args) -> str:
+    return url_join(url, *args)
+
+
+# Header templates shared by every client; _build_headers copies them once
+# per token change, not once per request.
+_JSON_HEADERS = {
+    "Content-Type": "application/json",
+    "Accept": "application/json"}
+_MIME_HEADERS = {}
+
+
+# Extended with httpx.TimeoutException when _httpx_for first imports httpx,
+# so the retry loop's isinstance check works without a module-scope import.
+_TIMEOUT_ERRORS = (requests.Timeout,)
+
+
+def _backoff_delay(count: int) -> float:
+    return min(30, 0.25 * (2 ** count)) + random.uniform(0, 0.25)
+
+
+def _jwt_expiry(token: str) -> float:
+    """Best-effort read of a JWT's exp claim; 0.0 disables token caching."""
+    try:
+        payload = token.split('.')[1]
+        payload += '=' * (-len(payload) % 4)
+        decoded = base64.urlsafe_b64decode(payload)
+        claims = orjson.loads(decoded) if orjson is not None else json.loads(decoded)
+        return float(claims['exp'])
+    except Exception:
+        return 0.0
+
+
+# One tuned session per host, shared by every Client targeting it, so the
+# trade/CSA/PIM clients amortize TLS handshakes over a single pool.
+_SESSION_CACHE = {}
+_SESSION_LOCK = threading.Lock()
+
+
+def _make_tuned_session() -> requests.Session:
+    session = requests.Session()
+    # Retries stay at the application level (see request()); the adapter
+    # only widens the pool so concurrent calls reuse warm connections.
+    adapter = requests.adapters.HTTPAdapter(
+        pool_connections=32, pool_maxsize=64, max_retries=0, pool_block=False)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.verify = False
+    return session
+
+
+def _session_for(endpoint: str) -> requests.Session:
+    key = urlsplit(endpoint).netloc
+    with _SESSION_LOCK:
+        session = _SESSION_CACHE.get(key)
+        if session is None:
+            session = _SESSION_CACHE[key] = _make_tuned_session()
+    return session
+
+
+# HTTP/2 clients, one per host like _SESSION_CACHE; many requests then
+# multiplex over a single TLS connection instead of queueing on the pool.
+_HTTPX_CACHE = {}
+
+
+# token_mgr lives on the ApiConfig shared by every client of an env, so its
+# lazy setup must serialize across instances, not per Client.
+_TOKEN_LOCK = threading.Lock()
+
+
+def _httpx_for(endpoint: str):
+    global _TIMEOUT_ERRORS
+    # Imported here so the http2 option costs nothing unless enabled;
+    # without the package installed it degrades to the requests path.
+    try:
+        import httpx
+    except ImportError:
+        return None
+    key = urlsplit(endpoint).netloc
+    with _SESSION_LOCK:
+        if httpx.TimeoutException not in _TIMEOUT_ERRORS:
+            _TIMEOUT_ERRORS += (httpx.TimeoutException,)
+        client = _HTTPX_CACHE.get(key)
+        if client is None:
+            client = _HTTPX_CACHE[key] = httpx.Client(
+                http2=True, verify=False, timeout=config.timeout,
+                limits=httpx.Limits(max_connections=32, max_keepalive_connections=32))
+    return client
+
+
 class Client:
-    _lock = threading.Lock()
 
     def __init__(self, api_name: str, *, env: XOneEnv, api: ApiConfig, loop=None):
 
@@ -92,9 +223,15 @@ class Client:
         self._api = api
         self._logger = get_logger()
         self._api_name = api_name
-        self._requests_session = requests.Session()
+        self._requests_session = _session_for(env.endpoint)
+        self._httpx_client = _httpx_for(env.endpoint) if config.http2 else None
         self._aiohttp_session = None
         self._loop = loop
+        self._cached_token = None
+        self._cached_headers_json = None
+        self._cached_headers_mime = None
+        self._token_value = None
+        self._token_expiry = 0.0
 
     @property
     def env(self):
@@ -109,68 +246,160 @@ class Client:
         return self._logger
 
     def headers(self, is_mime : bool =False) -> dict:
-        if not is_mime:
-            headers = {
-                "Content-Type": "application/json",
-                "Accept": "application/json"}
-        else:
-            headers = {}
-
-        if self._env.sgconnect_env is not MISSING:
-            with self._lock:
+        if self._env.sgconnect_env is MISSING:
+            if self._logger.isEnabledFor(logging.DEBUG):
+                self._logger.debug('No SGConnect required')
+            # _cached_headers_json is published last so a concurrent reader
+            # that sees it set also sees _cached_headers_mime.
+            if self._cached_headers_json is None:
+                self._cached_headers_mime = self._build_headers(True)
+                self._cached_headers_json = self._build_headers(False)
+            return self._cached_headers_mime if is_mime else self._cached_headers_json
+
+        # Fast path: token_mgr is only MISSING before the first request, so
+        # skip the lock once it is set (double-checked locking).
+        if self._api.token_mgr is MISSING:
+            with _TOKEN_LOCK:
                 if self._api.token_mgr is MISSING:
+                    # Imported here so clients that never touch SGConnect
+                    # do not pay the ezsgconnect import at module load.
+                    from ezsgconnect import sgconnect
                     self._logger.debug('Setting up token mgr ...')
                     if len(self._api.client_id) and len(self._api.client_secret):
                         self._logger.debug('Using client mode')
-                        self._api.token_mgr = sgconnect(
+                        # object.__setattr__: the config tree is frozen
+                        # post-load; token_mgr is the one mutable slot.
+                        object.__setattr__(self._api, 'token_mgr', sgconnect(
                             client_id=self._api.client_id,
                             client_secret=self._api.client_secret,
                             server=self._env.sgconnect_env,
-                            scope=self._api.scope)
+                            scope=self._api.scope))
                     else:
                         self._logger.debug('Using implicit mode')
-                        self._api.token_mgr = sgconnect(
+                        object.__setattr__(self._api, 'token_mgr', sgconnect(
                             implicit_client_id=self._env.implicit_client_id,
                             implicit_redirect_uri=self._env.implicit_redirect_uri,
                             server=self._env.sgconnect_env,
-                            scope=self._api.scope)
-            token_value = self._api.token_mgr.get_token_value()
-            headers["Authorization"] = 'Bearer ' + token_value
+                            scope=self._api.scope))
 
+        # Reuse the last token until 30s before its exp claim, skipping the
+        # token_mgr call entirely on the hot path.
+        if self._token_value is not None and time.time() < self._token_expiry - 30:
+            token_value = self._token_value
         else:
-            self._logger.debug('No SGConnect required')
+            token_value = self._api.token_mgr.get_token_value()
+            self._token_value = token_value
+            self._token_expiry = _jwt_expiry(token_value)
+        if token_value != self._cached_token:
+            authorization = 'Bearer ' + token_value
+            self._cached_headers_json = self._build_headers(False, authorization)
+            self._cached_headers_mime = self._build_headers(True, authorization)
+            self._cached_token = token_value
+
+        # requests copies headers into the PreparedRequest, so handing out
+        # the cached dict itself is safe and skips a copy per request.
+        return self._cached_headers_mime if is_mime else self._cached_headers_json
+
+    def _build_headers(self, is_mime: bool, authorization: str = None) -> dict:
+        headers = dict(_MIME_HEADERS if is_mime else _JSON_HEADERS)
+
+        if authorization is not None:
+            headers["Authorization"] = authorization
 
         if self._api.origin is not MISSING:
-            self._logger.debug('Origin: %s', self._api.origin)
+            if self._logger.isEnabledFor(logging.DEBUG):
+                self._logger.debug('Origin: %s', self._api.origin)
             headers["Origin"] = self._api.origin
 
         return headers
 
 
     def url(self, *last: str) -> str:
-        return url_join(self._env.end_point, self._env.tessa_env, self._api_name, 'rest', *last)
+        return _cached_url_join(self._env.end_point, self._env.tessa_env, self._api_name, 'rest', *last)
 
 
     # noinspection PyShadowingNames
-    def request(self, method: str, *last: str, json=None, stream=False, **params):
+    def request(self, method: str, *last: str, json=None, stream=False, is_mime: bool = False,
+                raw: bool = False, **params):
         url = self.url(*last)
         count = 0
         error = None
         timeout = config.timeout
         while count <= config.max_retries:
             try:
-                is_mime = params.pop("is_mime") if "is_mime" in params else False
-                resp = self._requests_session.request(
-                    method, url, headers=self.headers(is_mime), json=json,
-                    verify=False, stream=stream, timeout=timeout, **params)
-                resp = check_response(resp)
+                if self._httpx_client is not None and not stream:
+                    resp = self._httpx_client.request(
+                        method, url, headers=self.headers(is_mime), json=json,
+                        timeout=timeout, **params)
+                    resp = check_httpx_response(resp)
+                else:
+                    resp = self._requests_session.request(
+                        method, url, headers=self.headers(is_mime), json=json,
+                        stream=stream, timeout=timeout, **params)
+                    resp = check_response(resp)
+            except (Unauthorized, NotFound):
+                # Permanent errors; retrying cannot succeed.
+                raise
             except Exception as exc:
                 count += 1
-                time.sleep(0.5 * count)
-                timeout += count * 5
+                if isinstance(exc, _TIMEOUT_ERRORS):
+                    timeout += count * 5
+                if count <= config.max_retries:
+                    time.sleep(_backoff_delay(count))
                 error = exc
             else:
-                return resp.json() if not stream else resp
+                if stream:
+                    return resp
+                if raw:
+                    return resp.content
+                return orjson.loads(resp.content) if orjson is not None else resp.json()
+        else:
+            if error is not None:
+                raise ClientError(f'Client request failed for {method.upper()} {url}: {error}')
+            else:
+                raise ClientError(f'Client request failed for {method.upper()} {url} without any exception')
+
+
+    def _ensure_aiohttp_session(self) -> 'aiohttp.ClientSession':
+        # Imported here (like ezsgconnect in headers()) so synchronous
+        # callers never pay the aiohttp import.
+        try:
+            import aiohttp
+        except ImportError:
+            raise ClientError('arequest requires the aiohttp package')
+        if self._aiohttp_session is None:
+            connector = aiohttp.TCPConnector(limit=64, ssl=False, keepalive_timeout=75)
+            self._aiohttp_session = aiohttp.ClientSession(connector=connector, loop=self._loop)
+        return self._aiohttp_session
+
+
+    # noinspection PyShadowingNames
+    async def arequest(self, method: str, *last: str, json=None, is_mime: bool = False, **params):
+        session = self._ensure_aiohttp_session()
+        import aiohttp  # guaranteed importable once the session exists
+        url = self.url(*last)
+        count = 0
+        error = None
+        timeout = config.timeout
+        while count <= config.max_retries:
+            try:
+                async with session.request(
+                        method, url, headers=self.headers(is_mime), json=json,
+                        timeout=aiohttp.ClientTimeout(total=timeout), **params) as resp:
+                    await check_aiohttp_response(resp)
+                    if orjson is not None:
+                        return await resp.json(loads=orjson.loads)
+                    return await resp.json()
+            except (Unauthorized, NotFound):
+                # Permanent errors; retrying cannot succeed.
+                raise
+            except Exception as exc:
+                count += 1
+                if isinstance(exc, asyncio.TimeoutError):
+                    timeout += count * 5
+                if count <= config.max_retries:
+                    await asyncio.sleep(_backoff_delay(count))
+                error = exc
         else:
             if error is not None:
                 raise ClientError(f'Client request failed for {method.upper()} {url}: {error}')
@@ -178,6 +407,20 @@ class Client:
                 raise ClientError(f'Client request failed for {method.upper()} {url} without any exception')
 
 
+    async def aget(self, *last: str, **params):
+        return await self.arequest('get', *last, **params)
+
+
+    async def apost(self, *last: str, data=None, **params):
+        return await self.arequest('post', *last, data=data, **params)
+
+
+    async def aclose(self):
+        if self._aiohttp_session is not None:
+            await self._aiohttp_session.close()
+            self._aiohttp_session = None
+
+
     def get(self, *last: str, stream=False, **params):
         return self.request('get', *last, stream=stream, **params)
 
@@ -186,6 +429,51 @@ class Client:
         return self.request('post', *last, data=data, **params)
 
 
+    def request_path(self, path_expr: str, *last: str, method: str = 'get', **params):
+        """
+        Yield just the items matching an ijson path expression (e.g.
+        'results.item') from a streamed response, without building the full
+        JSON tree in memory -- useful when only a few keys of a large PIM
+        payload are needed. The request is issued eagerly; only the item
+        streaming is lazy.
+        """
+        try:
+            import ijson
+        except ImportError:
+            raise ClientError('request_path requires the ijson package')
+        resp = self.request(method, *last, stream=True, **params)
+        return self._iter_items(resp, path_expr)
+
+    @staticmethod
+    def _iter_items(resp, path_expr):
+        import ijson  # guaranteed importable: request_path checked it
+        try:
+            resp.raw.decode_content = True
+            yield from ijson.items(resp.raw, path_expr)
+        finally:
+            resp.close()
+
+
+    def batch_get(self, paths_list, max_workers=None, **params):
+        """
+        Fan out one get() per path tuple over a thread pool, returning results
+        in order. N calls complete in roughly max(RTT) instead of sum(RTT)
+        since the shared session pool keeps connections warm.
+        """
+        with ThreadPoolExecutor(max_workers=max_workers or 32) as executor:
+            return list(executor.map(lambda last: self.get(*last, **params), paths_list))
+
+
+    def batch_post(self, payloads, max_workers=None, **params):
+        """
+        Same as batch_get for post(); payloads is an iterable of
+        (path_tuple, json_body) pairs.
+        """
+        with ThreadPoolExecutor(max_workers=max_workers or 32) as executor:
+            return list(executor.map(
+                lambda item: self.post(*item[0], json=item[1], **params), payloads))
+
+
 class XOneTradeInfoClient(Client):
 
     def __init__(self, env: XOneEnv):
@@ -193,7 +481,7 @@ class XOneTradeInfoClient(Client):
         super().__init__("TradeInformation", env=env, api=env.trade_information)
 
     def url(self, *last: str) -> str:
-        return url_join(self._env.endpoint, 'api', self._api_name, self._env.version, *last)
+        return _cached_url_join(self._env.endpoint, 'api', self._api_name, self._env.version, *last)
 
 
 class XOneCSAInfoClient(Client):
@@ -203,7 +491,7 @@ class XOneCSAInfoClient(Client):
         super().__init__("Csa", env=env, api=env.csa_information)
 
     def url(self, *last: str) -> str:
-        return url_join(self._env.endpoint, 'api', self._api_name, "v1", *last)
+        return _cached_url_join(self._env.endpoint, 'api', self._api_name, "v1", *last)
 
 
 class XOnePricingModelClient(Client):
@@ -212,4 +500,4 @@ class XOnePricingModelClient(Client):
         super().__init__("Pim", env=env, api=env.pricing_model)
 
     def url(self, *last: str) -> str:
-        return url_join(self._env.endpoint, 'api', self._api_name, "v1", "PricingInterfaceModel", *last)
+        return _cached_url_join(self._env.endpoint, 'api', self._api_name, "v1", "PricingInterfaceModel", *last)
@@ -9,10 +9,16 @@ Rationale: we constantly struggle to manage the mapping from/to dict object (jso
 """
 
 
+import dataclasses
 import json
 import os
 import typing
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from datamodel import datamodel, optional, required
 
 __all__ = ['config', 'ApiConfig', 'XOneEnv', 'EnvType']
@@ -62,6 +68,7 @@ class RootConfig:
     logger: str = optional(default='fit_xone')
     max_retries: int = optional(default=0)
     timeout: int = optional(default=60)
+    http2: bool = optional(default=False)
 
 
 def load_config() -> RootConfig:
@@ -72,9 +79,35 @@ def load_config() -> RootConfig:
     if not os.path.exists(config_path):
         config_path = os.path.join(os.path.dirname(__file__), json_file)
     with open(config_path, 'rt') as fp:
-        return RootConfig.build(json.load(fp))
+        raw = orjson.loads(fp.read()) if orjson is not None else json.load(fp)
+    return RootConfig.build(raw)
+
+
+_MIRROR_CACHE = {}
+
+
+def _frozen_mirror(cls):
+    """
+    Build (once per class) a frozen, slotted dataclass mirroring a datamodel
+    config class, so attribute access after load is a C-level slot read with
+    no per-instance __dict__.
+    """
+    mirror = _MIRROR_CACHE.get(cls)
+    if mirror is None:
+        mirror = dataclasses.make_dataclass(
+            cls.__name__, list(cls.__annotations__), frozen=True, slots=True)
+        _MIRROR_CACHE[cls] = mirror
+    return mirror
+
+
+def _freeze(value):
+    cls = type(value)
+    if cls in (ApiConfig, XOneEnv, XOneConfig, RootConfig):
+        mirror = _frozen_mirror(cls)
+        return mirror(**{name: _freeze(getattr(value, name)) for name in cls.__annotations__})
+    return value
 
 
 EnvType = typing.Union[str, XOneEnv]
 
-config = load_config()
\ No newline at end of file
+config = _freeze(load_config())
\ No newline at end of file
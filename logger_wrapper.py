@@ -10,13 +10,10 @@ Custom logger to log using message templates based records to Elasticsearch thro
 import os
 import re
 import logging
+import functools
 import logging.config
 from logging import LogRecord, INFO
 
-import yaml
-
-from cmreslogging.handlers import CMRESHandler
-
 __all__ = [
     "LogStatus", "init_logger", "LoggerWrapper", "configure_logger"
 ]
@@ -41,6 +38,9 @@ class CustomAdapter(logging.LoggerAdapter):
     def __init__(self, logger, extra):
         super(CustomAdapter, self).__init__(logger, extra)
         self.logOrder = 0
+        # Bound methods cached for the per-record fast path in log().
+        self._is_enabled_for = logger.isEnabledFor
+        self._log = logger._log
 
     def info(self, msg, *args, **kwargs):
         """
@@ -55,13 +55,32 @@ class CustomAdapter(logging.LoggerAdapter):
         contextual information from this adapter instance.
         """
 
-        if self.isEnabledFor(level):
+        if self._is_enabled_for(level):
             self.logOrder += 1
             msg, kwargs = self.process(msg, kwargs)
             extra = kwargs.pop("extra")
             if extra is not None:
                 extra.update(dict(logOrder=self.logOrder))
-            self.logger.log(level, msg, *args, **kwargs, extra=extra)
+            # Call Logger._log directly (the same fast path the stdlib
+            # uses internally) to skip Logger.log's re-checks and boxing.
+            self._log(level, msg, args, extra=extra, **kwargs)
+
+
+_BRACE_RE = re.compile(r'\{[^}]*\}')
+
+
+@functools.lru_cache(maxsize=256)
+def _parse_template(msg):
+    """
+    Parse a message template once per distinct template string, returning the
+    placeholder names and a positional str.format-ready version of it.
+    """
+    placeholders = _BRACE_RE.findall(msg)
+    names = tuple(word[1:-1] for word in placeholders)
+    positional = msg
+    for i, word in enumerate(placeholders):
+        positional = positional.replace(word, '{%d}' % i, 1)
+    return names, positional
 
 
 class MessageTemplateLogRecord(LogRecord):
@@ -79,16 +98,13 @@ class MessageTemplateLogRecord(LogRecord):
         """
         msg = str(self.msg)
         if self.args:
-            res = re.findall(r'{.*?}', msg)
-            if not len(res):
+            names, positional = _parse_template(msg)
+            if not names:
                 msg = self.msg % self.args
             else:
                 self.messageTemplate = msg
-                for i, word in enumerate(res):
-                    self.__setattr__(word[1:-1], self.args[i])
-                    msg = msg.replace(word, f"{ {i} }")
-
-                msg = msg.format(*self.args)
+                self.__dict__.update(zip(names, self.args))
+                msg = positional.format(*self.args)
         return msg
 
 
@@ -106,6 +122,7 @@ class LoggerWrapper:
     def __init__(self, logger, run_key):
         self.runKey = run_key
         self.logger = logger
+        self._debug_enabled = logger.isEnabledFor(logging.DEBUG)
 
     def info(self, *args, **kwargs):
         self.logger.info(self._TEMPLATES['info'], self.runKey, *args, **kwargs)
@@ -117,8 +134,14 @@ class LoggerWrapper:
         self.logger.warning(self._TEMPLATES['warning'], self.runKey, *args, **kwargs)
 
     def debug(self, *args, **kwargs):
+        if not self._debug_enabled:
+            return
         self.logger.debug(self._TEMPLATES['debug'], self.runKey, *args, **kwargs)
 
+    def refresh_level(self):
+        """Re-read the effective level after a logging reconfiguration."""
+        self._debug_enabled = self.logger.isEnabledFor(logging.DEBUG)
+
     @classmethod
     def register_template(cls, level, template_message):
         cls._TEMPLATES[level] = template_message
@@ -133,9 +156,18 @@ def configure_logger(es_config: dict, file_path: str = None):
     if not file_path:
         file_path = DEFAULT_CONFIG_FILE_PATH
 
+    # Imported here so importing the module stays cheap; yaml and
+    # cmreslogging are only needed when logging is actually configured.
+    import yaml
+    try:
+        from yaml import CSafeLoader as YamlLoader
+    except ImportError:
+        from yaml import SafeLoader as YamlLoader
+    from cmreslogging.handlers import CMRESHandler
+
     try:
         with open(file_path, "rt") as f:
-            log_config = yaml.safe_load(f.read())
+            log_config = yaml.load(f.read(), Loader=YamlLoader)
             # noinspection PyArgumentList
             log_config["handlers"]['es_handler']['hosts'] = [{"host": es_config["host"], "port": es_config['port']}]
             log_config["handlers"]['es_handler']['auth_type'] = CMRESHandler.AuthType.BASIC_AUTH